@@ -1,6 +1,9 @@
 from __future__ import annotations
 
+import os
+import shlex
 import sys
+import time
 from concurrent.futures import ThreadPoolExecutor
 from typing import Callable, Optional, Tuple
 import io
@@ -10,10 +13,15 @@ from tkinter import ttk, messagebox, simpledialog
 from PIL import Image, ImageTk
 import qrcode
 
-from .models import CommandResult, Connection, Device, WifiNetwork
+from .completion import CommandHistory, CompletionIndex
+from .models import CommandResult, Connection, Device, NmcliInfo, WifiNetwork
 from .nmcli import Nmcli
 
 
+# Seconds before a hidden tab's data is considered stale when it is shown again
+STALE_AFTER_SECONDS = 30.0
+
+
 class App(tk.Tk):
     def __init__(self) -> None:
         super().__init__()
@@ -23,6 +31,21 @@ class App(tk.Tk):
         self.executor = ThreadPoolExecutor(max_workers=4)
         self._connections_cache = []
         self._devices_cache = []
+        self._wifi_cache = []
+        self._nmcli_info = None
+        self._nmcli_info_loading = False
+        self._history = CommandHistory()
+        self._completion: Optional[CompletionIndex] = None
+        self._completion_loading = False
+        # Per-source freshness: monotonic load time, pending invalidations, in-flight loads
+        self._loaded_at: dict[str, float] = {}
+        self._dirty: set[str] = set()
+        self._loading: set[str] = set()
+        self._loaders = {
+            "connections": self.refresh_connections,
+            "devices": self.refresh_devices,
+            "wifi": self.refresh_wifi,
+        }
 
         self.status_var = tk.StringVar(value="Ready")
 
@@ -44,15 +67,26 @@ class App(tk.Tk):
         self.notebook.add(self.wifi_tab, text="Wi-Fi")
         self.notebook.add(self.raw_tab, text="Raw nmcli")
 
+        # Data sources each tab needs; the dashboard summary is built from connections + devices
+        self._tab_sources = {
+            str(self.dashboard_tab): ("connections", "devices"),
+            str(self.connections_tab): ("connections",),
+            str(self.devices_tab): ("devices",),
+            str(self.wifi_tab): ("wifi",),
+            str(self.raw_tab): (),
+        }
+        self.notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed)
+
         status_bar = ttk.Label(self, textvariable=self.status_var, anchor=tk.W)
         status_bar.pack(fill=tk.X, side=tk.BOTTOM)
 
         self.protocol("WM_DELETE_WINDOW", self.on_close)
-        self.refresh_all()
+        self.refresh_visible()
 
     # ----- shared helpers -------------------------------------------------
     def on_close(self) -> None:
         self.executor.shutdown(wait=False)
+        self.nmcli.close()
         self.destroy()
 
     def run_task(self, fn: Callable, callback: Callable[[object, Optional[Exception]], None]) -> None:
@@ -83,14 +117,30 @@ class App(tk.Tk):
     def _update_dashboard(self, devices: list[Device], conns: list[Connection]) -> None:
         active = [c for c in conns if c.active]
         connected_devices = [d for d in devices if d.state.lower() == "connected"]
-        info = self.nmcli.info()
+        info = self._nmcli_info
+        if info is None:
+            self._ensure_nmcli_info()
+        version = (info.version or "unknown") if info else "checking..."
         lines = [
-            f"nmcli version: {info.version or 'unknown'}",
+            f"nmcli version: {version}",
             f"Connections: {len(conns)} (active: {len(active)})",
             f"Devices: {len(devices)} (connected: {len(connected_devices)})",
         ]
         self.info_label.config(text="\n".join(lines))
 
+    def _ensure_nmcli_info(self) -> None:
+        if self._nmcli_info is not None or self._nmcli_info_loading:
+            return
+        self._nmcli_info_loading = True
+        self.run_task(self.nmcli.info, self._on_nmcli_info_loaded)
+
+    def _on_nmcli_info_loaded(self, info: Optional[NmcliInfo], err: Optional[Exception]) -> None:
+        self._nmcli_info_loading = False
+        if err or info is None:
+            return
+        self._nmcli_info = info
+        self._update_dashboard(self._devices_cache, self._connections_cache)
+
     # ----- connections tab -----------------------------------------------
     def _build_connections_tab(self, parent: tk.Widget) -> tk.Frame:
         frame = ttk.Frame(parent, padding=8)
@@ -361,6 +411,10 @@ class App(tk.Tk):
         form = ttk.Frame(frame)
         self.raw_input = ttk.Entry(form)
         self.raw_input.insert(0, "device status")
+        self.raw_input.bind("<Return>", lambda _e: self._run_raw_command())
+        self.raw_input.bind("<Tab>", self._complete_raw_input)
+        self.raw_input.bind("<Up>", lambda _e: self._recall_history(self._history.previous()))
+        self.raw_input.bind("<Down>", lambda _e: self._recall_history(self._history.next()))
         run_btn = ttk.Button(form, text="Run", command=self._run_raw_command)
         self.raw_input.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 6))
         run_btn.pack(side=tk.LEFT)
@@ -379,9 +433,68 @@ class App(tk.Tk):
         cmd = self.raw_input.get().strip()
         if not cmd:
             return
+        self._history.add(cmd)
         self.set_status(f"Running nmcli {cmd}")
         self.run_task(lambda: self.nmcli.run_raw(cmd), self._handle_raw_result)
 
+    def _recall_history(self, entry: Optional[str]) -> str:
+        if entry is not None:
+            self.raw_input.delete(0, tk.END)
+            self.raw_input.insert(0, entry)
+        return "break"
+
+    def _ensure_completion_index(self) -> None:
+        if self._completion is not None or self._completion_loading:
+            return
+        self._completion_loading = True
+
+        def build() -> CompletionIndex:
+            info = self._nmcli_info or self.nmcli.info()
+            return CompletionIndex.load_or_build(info.version, self.nmcli.complete_args)
+
+        self.run_task(build, self._on_completion_loaded)
+
+    def _on_completion_loaded(self, index: Optional[CompletionIndex], err: Optional[Exception]) -> None:
+        self._completion_loading = False
+        if err or index is None:
+            # Completion is best-effort; the Raw tab keeps working without it
+            return
+        self._completion = index
+        self._update_completion_names()
+
+    def _update_completion_names(self) -> None:
+        if self._completion is None:
+            return
+        names: list[str] = []
+        for conn in self._connections_cache:
+            names.extend((conn.name, conn.uuid))
+        names.extend(dev.device for dev in self._devices_cache)
+        names.extend(net.ssid for net in self._wifi_cache)
+        self._completion.set_names(names)
+
+    def _complete_raw_input(self, _event: tk.Event) -> str:
+        if self._completion is None:
+            self._ensure_completion_index()
+            return "break"
+        cursor = self.raw_input.index(tk.INSERT)
+        start, prefix, candidates = self._completion.complete(self.raw_input.get()[:cursor])
+        if not candidates:
+            return "break"
+        if len(candidates) == 1:
+            word = shlex.quote(candidates[0]) + " "
+        else:
+            self.set_status("  ".join(candidates))
+            common = os.path.commonprefix(candidates)
+            if len(common) <= len(prefix):
+                return "break"
+            # quoted as a whole so a shared "Home " stays part of the word being completed
+            word = shlex.quote(common)
+        # replace the raw word (quotes and escapes included) with its completed form
+        self.raw_input.delete(start, cursor)
+        self.raw_input.insert(start, word)
+        self.raw_input.icursor(start + len(word))
+        return "break"
+
     def _handle_raw_result(self, result: Optional[CommandResult], err: Optional[Exception]) -> None:
         if err:
             self.show_error("nmcli error", str(err))
@@ -401,15 +514,57 @@ class App(tk.Tk):
 
     # ----- refresh actions ------------------------------------------------
     def refresh_all(self) -> None:
-        self.refresh_connections()
-        self.refresh_devices()
-        self.refresh_wifi()
+        """Mark every data source dirty; reload the visible tab and the dashboard summary now"""
+        self._dirty.update(self._loaders)
+        self.refresh_visible(self._eager_sources())
+
+    def refresh_visible(self, sources: Optional[tuple[str, ...]] = None) -> None:
+        """Load the given (default: visible tab's) sources if dirty, stale or never loaded"""
+        for source in self._visible_sources() if sources is None else sources:
+            if self._needs_refresh(source):
+                self._loaders[source]()
+
+    def _visible_sources(self) -> tuple[str, ...]:
+        return self._tab_sources.get(self.notebook.select(), ())
+
+    def _eager_sources(self) -> tuple[str, ...]:
+        # The dashboard summary is kept current after every command, whichever tab is shown
+        summary = self._tab_sources[str(self.dashboard_tab)]
+        return tuple(dict.fromkeys((*self._visible_sources(), *summary)))
+
+    def _needs_refresh(self, source: str) -> bool:
+        if source in self._loading:
+            return False
+        if source in self._dirty or source not in self._loaded_at:
+            return True
+        return time.monotonic() - self._loaded_at[source] > STALE_AFTER_SECONDS
+
+    def _on_tab_changed(self, _event: tk.Event) -> None:
+        if self.notebook.select() == str(self.raw_tab):
+            self._ensure_completion_index()
+        self.refresh_visible()
+
+    def _begin_load(self, source: str) -> None:
+        self._loading.add(source)
+        self._dirty.discard(source)
+
+    def _end_load(self, source: str, ok: bool) -> None:
+        self._loading.discard(source)
+        if not ok:
+            self._dirty.add(source)
+            return
+        self._loaded_at[source] = time.monotonic()
+        # Invalidated while this load was in flight: its result already predates the change
+        if source in self._dirty and source in self._eager_sources():
+            self._loaders[source]()
 
     def refresh_connections(self) -> None:
         self.set_status("Loading connections...")
+        self._begin_load("connections")
         self.run_task(self.nmcli.connection_list, self._on_connections_loaded)
 
     def _on_connections_loaded(self, conns: Optional[list[Connection]], err: Optional[Exception]) -> None:
+        self._end_load("connections", err is None)
         if err:
             self.show_error("nmcli error", str(err))
             self.set_status("Error")
@@ -417,14 +572,17 @@ class App(tk.Tk):
         assert conns is not None
         self._connections_cache = conns
         self._populate_connections(conns)
+        self._update_completion_names()
         self._update_dashboard(self._devices_cache, conns)
         self.set_status("Ready")
 
     def refresh_devices(self) -> None:
         self.set_status("Loading devices...")
+        self._begin_load("devices")
         self.run_task(self.nmcli.device_status, self._on_devices_loaded)
 
     def _on_devices_loaded(self, devices: Optional[list[Device]], err: Optional[Exception]) -> None:
+        self._end_load("devices", err is None)
         if err:
             self.show_error("nmcli error", str(err))
             self.set_status("Error")
@@ -432,20 +590,25 @@ class App(tk.Tk):
         assert devices is not None
         self._devices_cache = devices
         self._populate_devices(devices)
+        self._update_completion_names()
         self._update_dashboard(devices, self._connections_cache)
         self.set_status("Ready")
 
     def refresh_wifi(self) -> None:
         self.set_status("Scanning Wi-Fi...")
+        self._begin_load("wifi")
         self.run_task(self.nmcli.wifi_scan, self._on_wifi_loaded)
 
     def _on_wifi_loaded(self, nets: Optional[list[WifiNetwork]], err: Optional[Exception]) -> None:
+        self._end_load("wifi", err is None)
         if err:
             self.show_error("nmcli error", str(err))
             self.set_status("Error")
             return
         assert nets is not None
+        self._wifi_cache = nets
         self._populate_wifi(nets)
+        self._update_completion_names()
         self.set_status("Ready")
 
     # ----- generic command result ----------------------------------------
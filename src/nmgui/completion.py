@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import shlex
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+from .redaction import redact_args, strip_global_options
+
+# Context depth explored with `nmcli --complete-args` (objects, then their commands)
+_STATIC_DEPTH = 2
+_HISTORY_LIMIT = 500
+
+
+def _cache_dir() -> Path:
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(base) / "nmgui"
+
+
+def _state_dir() -> Path:
+    base = os.environ.get("XDG_STATE_HOME") or os.path.join(os.path.expanduser("~"), ".local", "state")
+    return Path(base) / "nmgui"
+
+
+class _Node:
+    __slots__ = ("children", "terminal")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, _Node] = {}
+        self.terminal = False
+
+
+class PrefixTrie:
+    def __init__(self, words: Iterable[str] = ()) -> None:
+        self._root = _Node()
+        self._size = 0
+        for word in words:
+            self.add(word)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, word: str) -> None:
+        if not word:
+            return
+        node = self._root
+        for ch in word:
+            node = node.children.setdefault(ch, _Node())
+        if not node.terminal:
+            node.terminal = True
+            self._size += 1
+
+    def complete(self, prefix: str, limit: int = 50) -> List[str]:
+        """Return up to `limit` words starting with prefix, in sorted order"""
+        node = self._root
+        for ch in prefix:
+            node = node.children.get(ch)
+            if node is None:
+                return []
+        found: List[str] = []
+        stack = [(node, prefix)]
+        while stack and len(found) < limit:
+            node, word = stack.pop()
+            if node.terminal:
+                found.append(word)
+            # push in reverse so the smallest child is visited first
+            for ch in sorted(node.children, reverse=True):
+                stack.append((node.children[ch], word + ch))
+        return found
+
+
+def _split_partial(text: str) -> tuple[List[str], str, int]:
+    """Split an in-progress command line shell-style.
+
+    Returns (completed tokens, unescaped current word, offset in text where the
+    current word starts). An unterminated quote simply extends the current word.
+    """
+    tokens: List[str] = []
+    current: List[str] = []
+    start: Optional[int] = None
+    quote: Optional[str] = None
+    escaped = False
+    for i, ch in enumerate(text):
+        if escaped:
+            current.append(ch)
+            escaped = False
+        elif quote:
+            if ch == quote:
+                quote = None
+            elif ch == "\\" and quote == '"':
+                escaped = True
+            else:
+                current.append(ch)
+        elif ch.isspace():
+            if start is not None:
+                tokens.append("".join(current))
+                current = []
+                start = None
+        else:
+            if start is None:
+                start = i
+            if ch == "\\":
+                escaped = True
+            elif ch in "'\"":
+                quote = ch
+            else:
+                current.append(ch)
+    if start is None:
+        return tokens, "", len(text)
+    return tokens, "".join(current), start
+
+
+class CompletionIndex:
+    """Completion for raw nmcli command lines.
+
+    Static words (objects, commands, options) come from `nmcli --complete-args`
+    and are cached on disk per nmcli version. Live object names are kept in a
+    separate trie and used where no static context applies.
+    """
+
+    def __init__(self, contexts: Optional[Dict[str, List[str]]] = None) -> None:
+        self._contexts: Dict[str, PrefixTrie] = {
+            key: PrefixTrie(words) for key, words in (contexts or {}).items()
+        }
+        self._names = PrefixTrie()
+
+    @classmethod
+    def load_or_build(cls, version: Optional[str], complete_args: Callable[[List[str]], List[str]]) -> "CompletionIndex":
+        # Without a version there is nothing to invalidate the cache on, so always explore
+        path = cls._cache_path(version) if version else None
+        if path is not None:
+            try:
+                data = json.loads(path.read_text())
+                if data.get("version") == version and data["contexts"]:
+                    return cls(data["contexts"])
+            except (OSError, ValueError, KeyError, AttributeError):
+                pass
+        contexts = cls._explore(complete_args)
+        # An empty result means --complete-args failed; retry next launch rather than caching it
+        if path is not None and contexts:
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_text(json.dumps({"version": version, "contexts": contexts}))
+            except OSError:
+                pass
+        return cls(contexts)
+
+    @staticmethod
+    def _cache_path(version: str) -> Path:
+        tag = re.sub(r"[^A-Za-z0-9._-]", "_", version)
+        return _cache_dir() / f"complete-{tag}.json"
+
+    @staticmethod
+    def _explore(complete_args: Callable[[List[str]], List[str]]) -> Dict[str, List[str]]:
+        contexts: Dict[str, List[str]] = {}
+        frontier: List[List[str]] = [[]]
+        for _ in range(_STATIC_DEPTH):
+            next_frontier: List[List[str]] = []
+            for path in frontier:
+                words = [w for w in complete_args([*path, ""]) if w]
+                if not words:
+                    continue
+                contexts[" ".join(path)] = words
+                next_frontier.extend([*path, w] for w in words if not w.startswith("-"))
+            frontier = next_frontier
+        return contexts
+
+    def set_names(self, names: Iterable[str]) -> None:
+        self._names = PrefixTrie(n for n in names if n)
+
+    def _resolve_context(self, tokens: List[str]) -> Optional[str]:
+        # Expand nmcli abbreviations ("con sh" -> "connection show") level by level
+        resolved: List[str] = []
+        # global options such as -t / -f NAME don't change the context
+        for token in strip_global_options(tokens):
+            trie = self._contexts.get(" ".join(resolved))
+            if trie is None:
+                return None
+            matches = trie.complete(token, limit=2)
+            if token in matches:
+                resolved.append(token)
+            elif len(matches) == 1:
+                resolved.append(matches[0])
+            else:
+                return None
+        return " ".join(resolved)
+
+    def complete(self, text: str, limit: int = 50) -> tuple[int, str, List[str]]:
+        """Return (start offset of the word, unescaped prefix, candidates) for a command line"""
+        tokens, prefix, start = _split_partial(text)
+        if tokens and tokens[0] == "nmcli":
+            tokens = tokens[1:]
+        key = self._resolve_context(tokens)
+        trie = self._contexts.get(key) if key is not None else None
+        if trie is not None:
+            candidates = trie.complete(prefix, limit)
+            if candidates:
+                return start, prefix, candidates
+        return start, prefix, self._names.complete(prefix, limit)
+
+
+def _carries_secrets(command: str) -> bool:
+    # Commands with secret values are kept in memory but never written to disk
+    try:
+        args = shlex.split(command)
+    except ValueError:
+        return True
+    return redact_args(args) != args
+
+
+class CommandHistory:
+    def __init__(self, path: Optional[Path] = None) -> None:
+        self._path = path or _state_dir() / "raw_history"
+        self._entries: List[str] = []
+        self._persisted: List[str] = []
+        self._cursor = 0
+        try:
+            self._persisted = self._path.read_text().splitlines()[-_HISTORY_LIMIT:]
+        except OSError:
+            pass
+        self._entries = list(self._persisted)
+        self._cursor = len(self._entries)
+
+    def add(self, command: str) -> None:
+        command = command.strip()
+        if command and (not self._entries or self._entries[-1] != command):
+            self._entries.append(command)
+            if not _carries_secrets(command):
+                self._persisted.append(command)
+                self._save()
+        self._cursor = len(self._entries)
+
+    def _save(self) -> None:
+        self._persisted = self._persisted[-_HISTORY_LIMIT:]
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            self._path.write_text("\n".join(self._persisted) + "\n")
+        except OSError:
+            pass
+
+    def previous(self) -> Optional[str]:
+        if self._cursor == 0:
+            return None
+        self._cursor -= 1
+        return self._entries[self._cursor]
+
+    def next(self) -> Optional[str]:
+        if self._cursor >= len(self._entries):
+            return None
+        self._cursor += 1
+        if self._cursor == len(self._entries):
+            return ""
+        return self._entries[self._cursor]
@@ -4,9 +4,11 @@ import os
 import shlex
 import shutil
 import subprocess
+import time
 from typing import Iterable, List, Optional
 
 from .models import CommandResult, Connection, Device, NmcliInfo, WifiNetwork
+from .session import SessionRecorder, SessionReplay
 
 
 def _split_t_fields(line: str, expected: int) -> List[str]:
@@ -32,10 +34,26 @@ def _split_t_fields(line: str, expected: int) -> List[str]:
     return parts
 
 
+def _replay_scale_from_env() -> float:
+    # A malformed NMGUI_REPLAY_SCALE falls back to the original timing rather than aborting startup
+    try:
+        scale = float(os.environ.get("NMGUI_REPLAY_SCALE", "1"))
+    except ValueError:
+        return 1.0
+    return scale if 0 <= scale < float("inf") else 1.0
+
+
 class Nmcli:
-    def __init__(self) -> None:
+    def __init__(self, recorder: Optional[SessionRecorder] = None, replay: Optional[SessionReplay] = None) -> None:
         self._nmcli_path = shutil.which("nmcli")
         self._pkexec_path = shutil.which("pkexec")
+        # NMGUI_RECORD=<file> captures every call; NMGUI_REPLAY=<file> serves a capture instead of nmcli
+        if recorder is None and os.environ.get("NMGUI_RECORD"):
+            recorder = SessionRecorder(os.environ["NMGUI_RECORD"])
+        if replay is None and os.environ.get("NMGUI_REPLAY"):
+            replay = SessionReplay.load(os.environ["NMGUI_REPLAY"], scale=_replay_scale_from_env())
+        self._recorder = recorder
+        self._replay = replay
         # Commands that modify state and need privileges
         self._privileged_commands = {
             "device connect",
@@ -51,13 +69,16 @@ class Nmcli:
         }
 
     def info(self) -> NmcliInfo:
-        if not self._nmcli_path:
+        if not self._nmcli_path and not self._replay:
             return NmcliInfo(version=None, available=False)
-        proc = subprocess.run([self._nmcli_path, "-g", "version", "general"],
-                              text=True, capture_output=True, check=False)
-        version = proc.stdout.strip() if proc.returncode == 0 else None
+        res = self._run_nmcli(["-g", "version", "general"])
+        version = res.stdout.strip() if res.returncode == 0 else None
         return NmcliInfo(version=version, available=True)
 
+    def close(self) -> None:
+        if self._recorder:
+            self._recorder.close()
+
     def _needs_privileges(self, args: List[str]) -> bool:
         """Check if command needs elevated privileges"""
         if len(args) < 2:
@@ -67,10 +88,12 @@ class Nmcli:
         return any(cmd_prefix.startswith(priv_cmd) for priv_cmd in self._privileged_commands)
 
     def _run_nmcli(self, args: Iterable[str], timeout: int = 20, force_privileged: bool = False) -> CommandResult:
+        args_list = list(args)
+        if self._replay:
+            return self._replay.respond(args_list)
         if not self._nmcli_path:
             raise RuntimeError("nmcli not found on PATH")
         
-        args_list = list(args)
         cmd = [self._nmcli_path, *args_list]
         
         # Try with pkexec if command needs privileges
@@ -80,8 +103,17 @@ class Nmcli:
                 cmd = [self._pkexec_path, self._nmcli_path, *args_list]
             # Otherwise try without pkexec and let nmcli handle it
         
-        proc = subprocess.run(cmd, text=True, capture_output=True, timeout=timeout, check=False)
-        return CommandResult(command=cmd, stdout=proc.stdout, stderr=proc.stderr, returncode=proc.returncode)
+        started = time.monotonic()
+        try:
+            proc = subprocess.run(cmd, text=True, capture_output=True, timeout=timeout, check=False)
+        except (subprocess.TimeoutExpired, OSError) as exc:
+            if self._recorder:
+                self._recorder.record_error(args_list, exc, time.monotonic() - started)
+            raise
+        result = CommandResult(command=cmd, stdout=proc.stdout, stderr=proc.stderr, returncode=proc.returncode)
+        if self._recorder:
+            self._recorder.record(args_list, result, time.monotonic() - started)
+        return result
 
     def connection_list(self) -> List[Connection]:
         res = self._run_nmcli(["-t", "-f", "NAME,UUID,TYPE,DEVICE,ACTIVE", "connection", "show"])
@@ -162,6 +194,13 @@ class Nmcli:
         # Auto-detect if privileges needed for raw commands
         return self._run_nmcli(parts)
 
+    def complete_args(self, args: List[str]) -> List[str]:
+        """Candidates nmcli itself offers for the last element of args"""
+        res = self._run_nmcli(["--complete-args", *args], timeout=5)
+        if res.returncode != 0:
+            return []
+        return [line.strip() for line in res.stdout.splitlines() if line.strip()]
+
     def get_wifi_password(self, ssid: str) -> Optional[str]:
         """Retrieve saved WiFi password for a given SSID (requires root)"""
         res = self._run_nmcli(["-g", "wifi-sec.psk", "connection", "show", ssid], force_privileged=True)
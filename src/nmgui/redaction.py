@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+from typing import Dict, List, Optional
+
+REDACTED = "<redacted>"
+
+# NetworkManager secret properties, i.e. those with a matching `*-flags` property,
+# plus vpn.secrets and wireguard.peers (which carries each peer's preshared-key)
+_SECRET_PROPERTIES: Dict[str, tuple[str, ...]] = {
+    "802-1x": (
+        "ca-cert-password", "client-cert-password", "password", "password-raw", "phase2-ca-cert-password",
+        "phase2-client-cert-password", "phase2-private-key-password", "pin", "private-key-password",
+    ),
+    "802-11-wireless-security": ("leap-password", "psk", "wep-key0", "wep-key1", "wep-key2", "wep-key3"),
+    "adsl": ("password",),
+    "cdma": ("password",),
+    "gsm": ("password", "pin"),
+    "macsec": ("mka-cak",),
+    "pppoe": ("password",),
+    "vpn": ("secrets",),
+    "wireguard": ("peers", "private-key"),
+}
+_SETTING_ALIASES = {"wifi-sec": "802-11-wireless-security"}
+# Command keywords followed by a secret (`device wifi connect/hotspot ... password X`)
+_SECRET_KEYWORDS = ("password",)
+# Output of these object/command paths contains secrets even without --show-secrets
+_SECRET_COMMANDS = (("device", "wifi", "show-password"), ("device", "wifi", "hotspot"), ("connection", "export"))
+
+# nmcli global options that consume the following argument
+_GLOBAL_OPTIONS_WITH_VALUE = ("colors", "escape", "fields", "get-values", "mode", "wait")
+_GLOBAL_OPTIONS = ("ask", "complete-args", "help", "offline", "overview", "pretty", "show-secrets", "terse", "version",
+                   *_GLOBAL_OPTIONS_WITH_VALUE)
+
+
+def match_option(arg: str, names: tuple[str, ...]) -> Optional[str]:
+    """Return the option in names that arg abbreviates, the way nmcli matches `-g`/`--get`"""
+    if not arg.startswith("-"):
+        return None
+    stem = arg.lstrip("-")
+    if not stem:
+        return None
+    for name in names:
+        if name.startswith(stem):
+            return name
+    return None
+
+
+def strip_global_options(args: List[str]) -> List[str]:
+    """Drop leading nmcli global options, and the values of those that take one"""
+    i = 0
+    while i < len(args):
+        option = match_option(args[i], _GLOBAL_OPTIONS)
+        if option is None:
+            break
+        i += 2 if option in _GLOBAL_OPTIONS_WITH_VALUE else 1
+    return args[i:]
+
+
+def _abbreviates(token: str, word: str, min_len: int = 1) -> bool:
+    return len(token) >= min_len and word.startswith(token)
+
+
+def _secret_settings(name: str) -> List[str]:
+    # nmcli accepts aliases and unambiguous prefixes of setting names; match every candidate
+    name = _SETTING_ALIASES.get(name, name)
+    return [setting for setting in _SECRET_PROPERTIES if _abbreviates(name, setting)]
+
+
+def _is_secret_property(token: str) -> bool:
+    """True for `setting.property` names (or abbreviations) that hold a secret"""
+    setting, dot, prop = token.lstrip("+-").lower().partition(".")
+    if not dot:
+        return False
+    return any(_abbreviates(prop, secret)
+               for name in _secret_settings(setting)
+               for secret in _SECRET_PROPERTIES[name])
+
+
+def _is_secret_key(token: str) -> bool:
+    return _is_secret_property(token) or any(_abbreviates(token, word, 2) for word in _SECRET_KEYWORDS)
+
+
+def _is_secret_field(field: str) -> bool:
+    """True for `-f`/`-g` field selectors that can print a secret"""
+    field = field.strip().lower()
+    if field in ("all", "common") or _is_secret_property(field):
+        return True
+    # a whole setting (`-g 802-1x`) prints all of its properties
+    return "." not in field and bool(_secret_settings(field))
+
+
+def _is_field_option(arg: str) -> bool:
+    return match_option(arg, ("fields", "get-values")) is not None
+
+
+def redact_args(args: List[str]) -> List[str]:
+    """Replace every value that follows a secret property name or keyword"""
+    redacted: List[str] = []
+    previous = ""
+    for i, arg in enumerate(args):
+        # `-g wifi-sec.psk` selects a field, so the name after it is not a key
+        is_key_position = i >= 1 and not (i >= 2 and _is_field_option(args[i - 2]))
+        if is_key_position and _is_secret_key(previous) and not _is_field_option(previous):
+            redacted.append(REDACTED)
+        else:
+            redacted.append(arg)
+        previous = arg
+    return redacted
+
+
+def output_has_secrets(args: List[str]) -> bool:
+    """Whether nmcli prints secrets for args (show-secrets, secret fields, show-password...)"""
+    for i, arg in enumerate(args):
+        if match_option(arg, ("show-secrets",)):
+            return True
+        if i >= 1 and _is_field_option(args[i - 1]) and any(_is_secret_field(f) for f in arg.split(",")):
+            return True
+    words = [a.lower() for a in strip_global_options(args) if not a.startswith("-")]
+    for path in _SECRET_COMMANDS:
+        if len(words) >= len(path) and all(_abbreviates(w, p) for w, p in zip(words, path)):
+            # "connection e" is ambiguous with edit; nmcli itself needs "ex"
+            if path[-1] != "export" or len(words[len(path) - 1]) >= 2:
+                return True
+    return False
+
+
+def scrub(text: str, values: List[str]) -> str:
+    """Remove every occurrence of the given secret values from text"""
+    for value in sorted(set(values), key=len, reverse=True):
+        if value:
+            text = text.replace(value, REDACTED)
+    return text
+
+
+def secret_values(args: List[str]) -> List[str]:
+    return [arg for arg, red in zip(args, redact_args(args)) if red != arg]
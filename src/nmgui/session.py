@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import gzip
+import json
+import subprocess
+import threading
+import time
+import zlib
+from typing import Dict, List, Tuple
+
+from .models import CommandResult
+from .redaction import REDACTED, output_has_secrets, redact_args, scrub, secret_values
+
+SESSION_FORMAT = 1
+
+
+class SessionRecorder:
+    """Append every nmcli invocation to a gzip'd JSON-lines session file.
+
+    Each line is flushed as it is written so a session cut short by a crash
+    still replays up to the last command.
+    """
+
+    def __init__(self, path: str) -> None:
+        self._lock = threading.Lock()
+        self._file = gzip.open(path, "wt", encoding="utf-8")
+        self._write({"format": SESSION_FORMAT, "recorded_at": time.time()})
+
+    def _write(self, entry: dict) -> None:
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.write(json.dumps(entry, separators=(",", ":")) + "\n")
+            self._file.flush()
+
+    def record(self, args: List[str], result: CommandResult, duration: float) -> None:
+        values = secret_values(args)
+        stdout, stderr = scrub(result.stdout, values), scrub(result.stderr, values)
+        if output_has_secrets(args):
+            # nmcli may echo the secret it printed in warnings, so drop stderr too
+            stdout = REDACTED if stdout else ""
+            stderr = REDACTED if stderr else ""
+        self._write({
+            "args": redact_args(args),
+            "stdout": stdout,
+            "stderr": stderr,
+            "rc": result.returncode,
+            "t": round(duration, 4),
+        })
+
+    def record_error(self, args: List[str], exc: Exception, duration: float) -> None:
+        """Record a call that never produced output (timeout, nmcli failed to start)"""
+        # TimeoutExpired's message repeats the full command line, secrets included
+        message = scrub(str(exc), secret_values(args))
+        error = {"type": "timeout" if isinstance(exc, subprocess.TimeoutExpired) else "oserror", "message": message}
+        if isinstance(exc, subprocess.TimeoutExpired):
+            error["timeout"] = exc.timeout
+        self._write({"args": redact_args(args), "error": error, "t": round(duration, 4)})
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class SessionReplay:
+    """Serve recorded nmcli responses in place of running nmcli.
+
+    Responses for the same (redacted) arguments are returned in recorded
+    order; once exhausted the last one repeats. `scale` multiplies the
+    recorded durations: 1.0 replays original timing, 0 answers instantly.
+    Recorded timeouts and start failures are raised again after the delay.
+    """
+
+    def __init__(self, entries: List[dict], scale: float = 1.0) -> None:
+        self.scale = scale
+        self._lock = threading.Lock()
+        self._responses: Dict[Tuple[str, ...], List[dict]] = {}
+        self._served: Dict[Tuple[str, ...], int] = {}
+        for entry in entries:
+            self._responses.setdefault(tuple(entry["args"]), []).append(entry)
+
+    @classmethod
+    def load(cls, path: str, scale: float = 1.0) -> "SessionReplay":
+        entries: List[dict] = []
+        with gzip.open(path, "rt", encoding="utf-8") as fh:
+            try:
+                for line in fh:
+                    entry = json.loads(line)
+                    if "format" in entry:
+                        if entry["format"] != SESSION_FORMAT:
+                            raise ValueError(f"unsupported session format {entry['format']}")
+                        continue
+                    entries.append(entry)
+            except (EOFError, zlib.error):
+                # recorder never closed the file; keep everything flushed before that
+                pass
+        return cls(entries, scale=scale)
+
+    def respond(self, args: List[str]) -> CommandResult:
+        key = tuple(redact_args(args))
+        command = ["nmcli", *args]
+        with self._lock:
+            responses = self._responses.get(key)
+            if not responses:
+                return CommandResult(command=command, stdout="", stderr=f"no recorded response for: nmcli {' '.join(key)}\n", returncode=1)
+            index = self._served.get(key, 0)
+            self._served[key] = index + 1
+            entry = responses[min(index, len(responses) - 1)]
+        if self.scale > 0:
+            time.sleep(entry["t"] * self.scale)
+        error = entry.get("error")
+        if error and error["type"] == "timeout":
+            raise subprocess.TimeoutExpired(command, error["timeout"])
+        if error:
+            raise OSError(error["message"])
+        return CommandResult(command=command, stdout=entry["stdout"], stderr=entry["stderr"], returncode=entry["rc"])